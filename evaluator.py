@@ -267,11 +267,11 @@ class Evaluator(object):
 
         # Activity 3.2
         # TODO: Verify if the use np.kron would be useful.
-        eigenvalues = np.zeros((2**len(pauli_string),), dtype=np.int)
+        eigenvalues = np.zeros((2**len(pauli_string),), dtype=int)
         # Eigenvalues of X, Y and Z are 1 and -1
         # Eigenvalues of I are 1 and 1
-        EIG_Z = np.array([+1,-1], dtype=np.int)
-        EIG_I = np.array([+1,+1], dtype=np.int)
+        EIG_Z = np.array([+1,-1], dtype=int)
+        EIG_I = np.array([+1,+1], dtype=int)
 
         for i in range(2**len(pauli_string)):
             s = f'0{len(pauli_string)}b'
@@ -11,7 +11,7 @@ For the licence, see the LICENCE file.
 """
 
 import numpy as np
-from pauli_string import PauliString, LinearCombinaisonPauliString
+from pauli_string import LinearCombinaisonPauliString
 
 class FermionicHamiltonian(object):
 
@@ -185,8 +185,8 @@ class OneBodyFermionicHamiltonian(FermionicHamiltonian):
         # Since each creation/annihilation operator consists of
         # 2 PauliString for each orbital and we compute ap * am, there
         # will be (2*n_orbs)**2 Coefs and PauliStrings.
-        new_coefs = np.zeros(((2*n_orbs)**2,),dtype = np.complex)
-        new_pauli_strings = np.zeros(((2*n_orbs)**2,),dtype = PauliString)
+        new_coefs = np.zeros(((2*n_orbs)**2,),dtype = np.complex128)
+        new_pauli_strings = list()
 
          # Activity 3.1.
         for i in range(len(aps)):
@@ -194,7 +194,7 @@ class OneBodyFermionicHamiltonian(FermionicHamiltonian):
                 term_ij_lcps = aps[i] * ams[j] * self.integrals[i,j]
                 start_idx = 4 * (i * len(ams) + j)
                 new_coefs[start_idx:start_idx+4] = term_ij_lcps.coefs
-                new_pauli_strings[start_idx:start_idx+4] = term_ij_lcps.pauli_strings
+                new_pauli_strings.extend(term_ij_lcps.pauli_strings)
 
         lcps = LinearCombinaisonPauliString(new_coefs, new_pauli_strings)
 
@@ -277,8 +277,8 @@ class TwoBodyFermionicHamiltonian(FermionicHamiltonian):
         # Since each creation/annihilation operator consist of
         # 2 PauliString for each orbital and we compute ap * ap * am * am
         # there will be (2*n_orbs)**4 Coefs and PauliStrings
-        new_coefs = np.zeros(((2*n_orbs)**4 ,),dtype = np.complex)
-        new_pauli_strings = np.zeros(((2*n_orbs)**4,),dtype = PauliString)
+        new_coefs = np.zeros(((2*n_orbs)**4 ,),dtype = np.complex128)
+        new_pauli_strings = list()
 
         # Activity 3.1.
         for i in range(len(aps)):
@@ -290,7 +290,7 @@ class TwoBodyFermionicHamiltonian(FermionicHamiltonian):
                         term_ijkl_lcps = aps[i] * aps[j] * ams[k] * ams[l] * self.integrals[i,j,k,l]
                         start_idx = 16 * (i * len(aps)**3 + j * len(ams)**2 + k * len(ams) + l)
                         new_coefs[start_idx:start_idx+16] = term_ijkl_lcps.coefs
-                        new_pauli_strings[start_idx:start_idx+16] = term_ijkl_lcps.pauli_strings
+                        new_pauli_strings.extend(term_ijkl_lcps.pauli_strings)
         lcps = 0.5 * LinearCombinaisonPauliString(new_coefs, new_pauli_strings)
 
         return lcps
@@ -10,15 +10,409 @@ This file is part of “The Three Qiskiteers H₂ ground state finder” (T3QH2)
 For the licence, see the LICENCE file.
 """
 
+import weakref
+
 import numpy as np
 
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional.
+    njit = prange = None
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10.
+    def _popcount(value):
+        return bin(value).count('1')
+
+
+def _bits_to_int(bits):
+    """
+    Pack an array of booleans into an `int` where bit `i` is `bits[i]`.
+
+    Parameters
+    ----------
+    bits : np.ndarray<bool>
+        Bits to pack, least significant first.
+
+    Returns
+    -------
+    int
+        The packed bits.
+    """
+
+    packed = np.packbits(np.asarray(bits, dtype=bool), bitorder='little')
+
+    return int.from_bytes(packed.tobytes(), 'little')
+
+
+def _int_to_bits(value, n_bits):
+    """
+    Unpack the `n_bits` least significant bits of an `int` into an array of
+    booleans. Inverse of `_bits_to_int`.
+
+    Parameters
+    ----------
+    value : int
+        The packed bits.
+    n_bits : int
+        Number of bits to unpack.
+
+    Returns
+    -------
+    np.ndarray<bool>
+        Array of length `n_bits`.
+    """
+
+    packed = np.frombuffer(value.to_bytes((n_bits + 7)//8, 'little'), dtype=np.uint8)
+
+    return np.unpackbits(packed, count=n_bits, bitorder='little').astype(bool)
+
+
+_WORD = np.dtype('<u8')
+# Number of products computed at once by `mul_and_combine`.
+_PRODUCTS_PER_BLOCK = 2**14
+# Phases `(-1j)**w` indexed by the winding number `w` modulo 4.
+_IPOW_NEG = np.array([1, -1j, -1, 1j], dtype=np.complex128)
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+# Lookup tables from the ASCII code of a Pauli label to its bits.
+_PAULI_TABLE = np.zeros(256, dtype=bool)
+_Z_TABLE = np.zeros(256, dtype=bool)
+_X_TABLE = np.zeros(256, dtype=bool)
+for _label in 'IXYZixyz':
+    _PAULI_TABLE[ord(_label)] = True
+    _Z_TABLE[ord(_label)] = _label in 'YZyz'
+    _X_TABLE[ord(_label)] = _label in 'XYxy'
+del _label
+# ASCII codes of the Pauli labels indexed by `z_bits + 2*x_bits`.
+_LABELS = np.frombuffer(b'IZXY', dtype=np.uint8)
+
+
+def _ints_to_words(values, n_words):
+    """
+    Pack a sequence of `int`s into a two-dimensional array of 64 bits words.
+
+    Parameters
+    ----------
+    values : list<int>
+        Packed bits, as stored by `PauliString`.
+    n_words : int
+        Number of 64 bits words per value.
+
+    Returns
+    -------
+    np.ndarray<uint64>
+        Array of shape `(len(values), n_words)`, least significant word first.
+    """
+
+    buffer = b''.join(value.to_bytes(8*n_words, 'little') for value in values)
+
+    return np.frombuffer(buffer, dtype=_WORD).reshape(len(values), n_words)
+
+
+def _words_to_ints(words):
+    """
+    Inverse of `_ints_to_words`.
+
+    Parameters
+    ----------
+    words : np.ndarray<uint64>
+        Array of shape `(n_values, n_words)`.
+
+    Returns
+    -------
+    list<int>
+        The packed bits of each line of `words`.
+    """
+
+    words = np.ascontiguousarray(words, dtype=_WORD)
+
+    return [int.from_bytes(line.tobytes(), 'little') for line in words]
+
+
+def _ints_to_bits(values, n_bits):
+    """
+    Unpack a sequence of `int`s into a two-dimensional array of booleans.
+
+    Parameters
+    ----------
+    values : list<int>
+        Packed bits, as stored by `PauliString`.
+    n_bits : int
+        Number of bits to unpack from each value.
+
+    Returns
+    -------
+    np.ndarray<bool>
+        Array of shape `(len(values), n_bits)`.
+    """
+
+    return _words_to_bits(_ints_to_words(values, (n_bits + 63)//64), n_bits)
+
+
+def _words_to_bits(words, n_bits):
+    """
+    Unpack 64 bits words into a two-dimensional array of booleans. Inverse
+    of `_bits_to_words`.
+
+    Parameters
+    ----------
+    words : np.ndarray<uint64>
+        Array of shape `(n_values, n_words)`.
+    n_bits : int
+        Number of bits to unpack from each line.
+
+    Returns
+    -------
+    np.ndarray<bool>
+        Array of shape `(n_values, n_bits)`.
+    """
+
+    as_bytes = np.ascontiguousarray(words, dtype=_WORD).view(np.uint8)
+    bits = np.unpackbits(as_bytes, axis=1, count=n_bits, bitorder='little')
+
+    return bits.astype(bool)
+
+
+def _bits_to_words(bits):
+    """
+    Pack a two-dimensional array of booleans into 64 bits words.
+
+    Parameters
+    ----------
+    bits : np.ndarray<bool>
+        Array of shape `(n_values, n_bits)`, least significant bit first.
+
+    Returns
+    -------
+    np.ndarray<uint64>
+        Array of shape `(n_values, ceil(n_bits/64))`, least significant word
+        first.
+    """
+
+    n_words = (bits.shape[1] + 63)//64
+    packed = np.packbits(bits, axis=1, bitorder='little')
+    buffer = np.zeros((len(bits), 8*n_words), dtype=np.uint8)
+    buffer[:, :packed.shape[1]] = packed
+
+    return buffer.view(_WORD)
+
+
+def _group_lines(array, groups=None):
+    """
+    Group the identical lines of a two-dimensional array. Each line is
+    hashed as one `bytes` key, which avoids sorting the lines.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        Array of shape `(n_lines, n_columns)`.
+    groups : dict, optional, default=None
+        Groups found by previous calls, updated in place. New groups are
+        numbered after the existing ones. Allows to group an array given
+        block by block.
+
+    Returns
+    -------
+    np.ndarray<int>, np.ndarray<int>
+        Index of the first occurrence of each new group, in order of
+        appearance, and group of each line.
+    """
+
+    if groups is None:
+        groups = dict()
+
+    array = np.ascontiguousarray(array)
+    keys = array.view(np.dtype((np.void, array.itemsize*array.shape[1]))).ravel().tolist()
+
+    index = list()
+    inverse = list()
+    for i, key in enumerate(keys):
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = len(groups)
+            index.append(i)
+        inverse.append(group)
+
+    return np.array(index, dtype=np.intp), np.array(inverse, dtype=np.intp)
+
+
+def _popcount_words(words):
+    """
+    Count the set bits of an array of 64 bits words along its last axis.
+
+    Parameters
+    ----------
+    words : np.ndarray<uint64>
+        Array of words.
+
+    Returns
+    -------
+    np.ndarray<int>
+        Number of set bits, with the last axis of `words` removed.
+    """
+
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0.
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+
+    as_bytes = np.ascontiguousarray(words, dtype=_WORD).view(np.uint8)
+
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1)
+
+
+def _mul_words_numpy(z1, x1, z2, x2):
+    """
+    Products of all the pairs of two sets of packed Pauli strings.
+
+    Parameters
+    ----------
+    z1, x1 : np.ndarray<uint64>
+        Packed bits of the left factors, of shape `(N, n_words)`.
+    z2, x2 : np.ndarray<uint64>
+        Packed bits of the right factors, of shape `(M, n_words)`.
+
+    Returns
+    -------
+    np.ndarray<uint64>, np.ndarray<uint64>, np.ndarray<int>
+        Packed bits of the products, of shape `(N, M, n_words)`, and the
+        winding numbers `w` of shape `(N, M)`, the phases being `(-1j)**w`.
+    """
+
+    z1, x1 = z1[:, None, :], x1[:, None, :]
+    z2, x2 = z2[None, :, :], x2[None, :, :]
+    new_z = z1 ^ z2
+    new_x = x1 ^ x2
+    # See `PauliString.mul_pauli_string` for the phase.
+    anticommuting = (z2 & x1) ^ (z1 & x2)
+    cyclic = anticommuting & (x1 ^ z2 ^ (z1 | x2))
+    w = (_popcount_words(anticommuting) - 2 * _popcount_words(cyclic)) % 4
+
+    return new_z, new_x, w
+
+
+def _scatter_matrix_numpy(z_masks, x_masks, factors, size):
+    """
+    Dense matrix of a linear combination of Pauli strings. Each term has a
+    single non-zero element per line, see `PauliString.matrix_elements`.
+
+    Parameters
+    ----------
+    z_masks, x_masks : np.ndarray<uint64>
+        Packed bits of the terms, for at most 64 qubits.
+    factors : np.ndarray<complex>
+        Coefficient of each term times `(-1j)**popcount(z & x)`.
+    size : int
+        Side of the matrix, `2**n_qubits`.
+
+    Returns
+    -------
+    np.array<complex>
+        A `size` side square matrix.
+    """
+
+    matrix = np.zeros((size, size), dtype=np.complex128)
+    if len(factors) == 0:
+        return matrix
+
+    rows = np.arange(size, dtype=np.uint64)
+    row_index = np.arange(size)
+
+    # Terms with the same `x` fill the same elements: sum their values on
+    # one line-sized buffer, then write it with a single fancy index. Only
+    # `O(size)` temporaries are used besides the matrix.
+    values = np.empty(size, dtype=np.complex128)
+    order = np.argsort(x_masks, kind='stable')
+    starts = np.flatnonzero(np.r_[True, x_masks[order][1:] != x_masks[order][:-1]])
+    for group in np.split(order, starts[1:]):
+        values[:] = 0
+        for k in group:
+            signs = 1 - 2*(_popcount_words((rows & z_masks[k])[:, None]) & 1)
+            values += factors[k]*signs
+        matrix[row_index, (rows ^ x_masks[group[0]]).astype(np.intp)] = values
+
+    return matrix
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _popcount64(value):
+        """
+        Number of set bits of a 64 bits word (SWAR algorithm).
+        """
+
+        value = value - ((value >> np.uint64(1)) & np.uint64(0x5555555555555555))
+        value = ((value & np.uint64(0x3333333333333333))
+                 + ((value >> np.uint64(2)) & np.uint64(0x3333333333333333)))
+        value = (value + (value >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+
+        return np.int64((value * np.uint64(0x0101010101010101)) >> np.uint64(56))
+
+    @njit(cache=True, parallel=True)
+    def _mul_words_numba(z1, x1, z2, x2):
+        """
+        Same as `_mul_words_numpy`, compiled with Numba.
+        """
+
+        n_left, n_words = z1.shape
+        n_right = z2.shape[0]
+        new_z = np.empty((n_left, n_right, n_words), dtype=np.uint64)
+        new_x = np.empty((n_left, n_right, n_words), dtype=np.uint64)
+        w = np.empty((n_left, n_right), dtype=np.int64)
+        for i in prange(n_left):
+            for j in range(n_right):
+                count = 0
+                for k in range(n_words):
+                    new_z[i, j, k] = z1[i, k] ^ z2[j, k]
+                    new_x[i, j, k] = x1[i, k] ^ x2[j, k]
+                    anticommuting = (z2[j, k] & x1[i, k]) ^ (z1[i, k] & x2[j, k])
+                    cyclic = anticommuting & (x1[i, k] ^ z2[j, k] ^ (z1[i, k] | x2[j, k]))
+                    count += _popcount64(anticommuting) - 2 * _popcount64(cyclic)
+                w[i, j] = count % 4
+
+        return new_z, new_x, w
+
+    @njit(cache=True, parallel=True)
+    def _scatter_matrix_numba(z_masks, x_masks, factors, size):
+        """
+        Same as `_scatter_matrix_numpy`, compiled with Numba. The lines are
+        shared among the threads, so no element is written concurrently.
+        """
+
+        matrix = np.zeros((size, size), dtype=np.complex128)
+        for row in prange(size):
+            r = np.uint64(row)
+            for k in range(len(factors)):
+                sign = 1 - 2*(_popcount64(r & z_masks[k]) & 1)
+                matrix[row, np.int64(r ^ x_masks[k])] += factors[k]*sign
+
+        return matrix
+
+    _mul_words = _mul_words_numba
+    _scatter_matrix = _scatter_matrix_numba
+else:
+    _mul_words = _mul_words_numpy
+    _scatter_matrix = _scatter_matrix_numpy
+
+
+# Interned `PauliStrings`, see `PauliString.intern`.
+_INTERNED_PAULI_STRINGS = weakref.WeakValueDictionary()
+
 
 class PauliString(object):
 
+    # `PauliStrings` are immutable: they are shared (see `intern`) and cache
+    # their unpacked bits.
+    __slots__ = ('_z', '_x', '_n_qubits', '_z_bits', '_x_bits', '__weakref__')
+
     def __init__(self, z_bits, x_bits):
         """
         Describe a Pauli string as 2 arrays of booleans. The `PauliString` represents `(-1j)**(z_bits*x_bits) Z**z_bits X**x_bits`.
 
+        The bits are stored packed into two `int`s, `z` and `x`, where bit
+        `i` corresponds to qubit `i`. The products and reductions then reduce
+        to a few integer XOR, AND and popcount operations.
+
         Parameters
         ----------
         z_bits : np.ndarray<bool>
@@ -35,8 +429,60 @@ class PauliString(object):
         if len(z_bits) != len(x_bits):
             raise ValueError('z_bits and x_bits must have the same number of elements')
 
-        self.z_bits = z_bits
-        self.x_bits = x_bits
+        self._n_qubits = len(z_bits)
+        self._z = _bits_to_int(z_bits)
+        self._x = _bits_to_int(x_bits)
+        self._z_bits = self._x_bits = None
+
+    @property
+    def z(self):
+        """
+        int : Bit `i` is set where a Z Pauli is applied on qubit `i`.
+        """
+
+        return self._z
+
+    @property
+    def x(self):
+        """
+        int : Bit `i` is set where a X Pauli is applied on qubit `i`.
+        """
+
+        return self._x
+
+    @property
+    def n_qubits(self):
+        """
+        int : Length of the `PauliString`, also number of qubits.
+        """
+
+        return self._n_qubits
+
+    @property
+    def z_bits(self):
+        """
+        np.ndarray<bool> : True where a Z Pauli is applied. Read-only, unpacked
+        once and then shared.
+        """
+
+        if self._z_bits is None:
+            self._z_bits = _int_to_bits(self._z, self._n_qubits)
+            self._z_bits.flags.writeable = False
+
+        return self._z_bits
+
+    @property
+    def x_bits(self):
+        """
+        np.ndarray<bool> : True where a X Pauli is applied. Read-only, unpacked
+        once and then shared.
+        """
+
+        if self._x_bits is None:
+            self._x_bits = _int_to_bits(self._x, self._n_qubits)
+            self._x_bits.flags.writeable = False
+
+        return self._x_bits
 
     def __str__(self):
         """
@@ -48,11 +494,8 @@ class PauliString(object):
             String of I, Z, X and Y.
         """
 
-        pauli_labels = 'IZXY'
-        pauli_choices = (self.z_bits + 2*self.x_bits).astype(int)
-        out = ''
-        for i in reversed(pauli_choices):
-            out += pauli_labels[i]
+        pauli_choices = self.z_bits.astype(np.uint8) + 2*self.x_bits.astype(np.uint8)
+        out = _LABELS[pauli_choices[::-1]].tobytes().decode('ascii')
         return out
 
     def __len__(self):
@@ -65,7 +508,7 @@ class PauliString(object):
             Length of the `PauliString`, also number of qubits.
         """
 
-        return len(self.z_bits)
+        return self._n_qubits
 
     def __mul__(self, other):
         """
@@ -111,6 +554,102 @@ class PauliString(object):
 
         return self.__mul__(other)
 
+    @classmethod
+    def from_ints(cls, z, x, n_qubits):
+        """
+        Construct a `PauliString` directly from its packed representation.
+
+        Parameters
+        ----------
+        z : int
+            Bit `i` is set where a Z Pauli is applied on qubit `i`.
+        x : int
+            Bit `i` is set where a X Pauli is applied on qubit `i`.
+        n_qubits : int
+            Length of the `PauliString`.
+
+        Returns
+        -------
+        PauliString
+            The Pauli string specified by `z` and `x`.
+        """
+
+        new = cls.__new__(cls)
+        new._n_qubits = n_qubits
+        new._z = z
+        new._x = x
+        new._z_bits = new._x_bits = None
+
+        return new
+
+    @classmethod
+    def intern(cls, z, x, n_qubits):
+        """
+        Same as `from_ints`, but returns the existing `PauliString` if the
+        same one is still alive. The many identical `PauliStrings` of a
+        Hamiltonian then share one object and its unpacked bits. This is safe
+        since `PauliStrings` are immutable.
+
+        A lookup costs more than `from_ints`, especially when the result is
+        short-lived, so it is only used when parsing (`from_str`,
+        `from_zx_bits`) and not by the products.
+
+        Parameters
+        ----------
+        z : int
+            Bit `i` is set where a Z Pauli is applied on qubit `i`.
+        x : int
+            Bit `i` is set where a X Pauli is applied on qubit `i`.
+        n_qubits : int
+            Length of the `PauliString`.
+
+        Returns
+        -------
+        PauliString
+            The Pauli string specified by `z` and `x`.
+        """
+
+        key = (cls, z, x, n_qubits)
+        pauli_string = _INTERNED_PAULI_STRINGS.get(key)
+        if pauli_string is None:
+            pauli_string = cls.from_ints(z, x, n_qubits)
+            _INTERNED_PAULI_STRINGS[key] = pauli_string
+
+        return pauli_string
+
+    @classmethod
+    def from_bool_arrays(cls, z_bits, x_bits):
+        """
+        Construct a `PauliString` from its `z_bits` and `x_bits`. Same as the
+        constructor.
+
+        Parameters
+        ----------
+        z_bits : np.ndarray<bool>
+            True where a Z Pauli is applied.
+        x_bits : np.ndarray<bool>
+            True where a X Pauli is applied.
+
+        Returns
+        -------
+        PauliString
+            The Pauli string specified by `z_bits` and `x_bits`.
+        """
+
+        return cls(z_bits, x_bits)
+
+    def to_bool_arrays(self):
+        """
+        Unpack the `PauliString` into its `z_bits` and `x_bits`.
+
+        Returns
+        -------
+        np.ndarray<bool>, np.ndarray<bool>
+            The `z_bits` and the `x_bits`.
+        """
+
+        return self.z_bits, self.x_bits
+
     @classmethod
     def from_zx_bits(cls, zx_bits):
         """
@@ -128,13 +667,13 @@ class PauliString(object):
             The Pauli string specified by `zx_bits`.
         """
 
-        z_bits = x_bits = None
-
         # Activity 3.1.
         z_bits = zx_bits[:len(zx_bits)//2]
         x_bits = zx_bits[len(zx_bits)//2:]
+        if len(z_bits) != len(x_bits):
+            raise ValueError('z_bits and x_bits must have the same number of elements')
 
-        return cls(z_bits, x_bits)
+        return cls.intern(_bits_to_int(z_bits), _bits_to_int(x_bits), len(z_bits))
 
     @classmethod
     def from_str(cls, pauli_str):
@@ -154,27 +693,17 @@ class PauliString(object):
         """
 
         # Activity 3.1.
-        z_bits, x_bits = [], []
-        for pauli in pauli_str[::-1]:
-            if pauli.upper() == 'X':
-                z_bits.append(False)
-                x_bits.append(True)
-            elif pauli.upper() == 'Y':
-                z_bits.append(True)
-                x_bits.append(True)
-            elif pauli.upper() == 'Z':
-                z_bits.append(True)
-                x_bits.append(False)
-            elif pauli.upper() == 'I':
-                z_bits.append(False)
-                x_bits.append(False)
-            else:
-                raise ValueError('Pauli string must only have characters X, Y, Z and I')
-
-        z_bits = np.array(z_bits, dtype=bool)
-        x_bits = np.array(x_bits, dtype=bool)
+        try:
+            codes = np.frombuffer(pauli_str[::-1].encode('ascii'), dtype=np.uint8)
+        except UnicodeEncodeError:
+            codes = None
+        if codes is None or not _PAULI_TABLE[codes].all():
+            raise ValueError('Pauli string must only have characters X, Y, Z and I')
 
-        return cls(z_bits, x_bits)
+        z_bits = _Z_TABLE[codes]
+        x_bits = _X_TABLE[codes]
+
+        return cls.intern(_bits_to_int(z_bits), _bits_to_int(x_bits), len(z_bits))
 
     def to_zx_bits(self):
         """
@@ -188,7 +717,7 @@ class PauliString(object):
         """
 
         # Activity 3.1.
-        zx_bits = np.concatenate((self.z_bits, self.x_bits))
+        zx_bits = _int_to_bits(self._z | self._x << self._n_qubits, 2*self._n_qubits)
 
         return zx_bits
 
@@ -204,7 +733,7 @@ class PauliString(object):
         """
 
         # Activity 3.1.
-        xz_bits = np.concatenate((self.x_bits, self.z_bits))
+        xz_bits = _int_to_bits(self._x | self._z << self._n_qubits, 2*self._n_qubits)
 
         return xz_bits
 
@@ -273,20 +802,20 @@ class PauliString(object):
         # new_x_bits = (new_pauli_array == 'X') + new_y_bits
         # new_z_bits = (new_pauli_array == 'Z') + new_y_bits
 
-        new_z_bits = new_x_bits = phase = None
-
         # Activity 3.1.
         # xor will do mod 2 addition to the bitstring.
-        new_z_bits = np.logical_xor(self.z_bits, other.z_bits)
-        new_x_bits = np.logical_xor(self.x_bits, other.x_bits)
-        # 2z2 · x1 + z1 · x1 + z2 · x2 - z3 · x3
-        w = (2 * np.sum(np.logical_and(other.z_bits, self.x_bits))
-             + np.sum(np.logical_and(self.z_bits, self.x_bits))
-             + np.sum(np.logical_and(other.z_bits, other.x_bits))
-             - np.sum(np.logical_and(new_z_bits, new_x_bits))) % 4
-        phase = (-1j)**w
-
-        return self.__class__(new_z_bits, new_x_bits), phase
+        new_z = self._z ^ other._z
+        new_x = self._x ^ other._x
+        # Only the qubits where the two Paulis anticommute contribute to the
+        # phase: +i for the cyclic products XY, YZ and ZX, -i for YX, ZY and
+        # XZ. In terms of `w`, with phase = (-1j)**w, this is
+        # w = #anticommuting - 2 #cyclic (mod 4).
+        anticommuting = (other._z & self._x) ^ (self._z & other._x)
+        cyclic = anticommuting & (self._x ^ other._z ^ (self._z | other._x))
+        w = (_popcount(anticommuting) - 2 * _popcount(cyclic)) % 4
+        phase = _IPOW_NEG[w]
+
+        return self.from_ints(new_z, new_x, self._n_qubits), phase
 
     def mul_coef(self, coef):
         """
@@ -304,8 +833,8 @@ class PauliString(object):
         """
 
         # Activity 3.1.
-        coefs = np.array([coef], dtype=complex)
-        pauli_strings = np.array([self], dtype=PauliString)
+        coefs = np.array([coef], dtype=np.complex128)
+        pauli_strings = [self]
 
         return LinearCombinaisonPauliString(coefs, pauli_strings)
 
@@ -320,7 +849,8 @@ class PauliString(object):
         """
 
         # Activity 3.1.
-        ids = (self.x_bits | self.z_bits) == False
+        mask = (1 << self._n_qubits) - 1
+        ids = _int_to_bits(~(self._x | self._z) & mask, self._n_qubits)
 
         return ids
 
@@ -334,12 +864,33 @@ class PauliString(object):
             A copy.
         """
 
-        return PauliString(self.z_bits.copy(), self.x_bits.copy())
+        return PauliString.from_ints(self._z, self._x, self._n_qubits)
+
+    def matrix_elements(self):
+        """
+        Non-zero elements of the matrix representation of the `PauliString`.
+        There is exactly one per line: on line `r`, it sits in column
+        `r ^ x` and is worth `(-1j)**popcount(z & x) * (-1)**popcount(r & z)`,
+        where qubit `i` is bit `i` of the line and column indices.
+
+        Returns
+        -------
+        np.array<int>, np.array<complex>
+            The column and the value of the non-zero element of each line.
+        """
+
+        rows = np.arange(2**self._n_qubits)
+        cols = rows ^ self._x
+        signs = 1 - 2*(_popcount_words((rows & self._z)[:, None]) & 1)
+        values = _IPOW_NEG[_popcount(self._z & self._x) & 3] * signs
+
+        return cols, values
 
     def to_matrix(self):
         """
-        Build the matrix representation of the `PauliString` using the
-        Kronecker product.
+        Build the matrix representation of the `PauliString`. Since a Pauli
+        string has a single non-zero element per line, they are written
+        directly instead of using the Kronecker product.
 
         Returns
         -------
@@ -347,17 +898,11 @@ class PauliString(object):
             A :math:`2^n` side square matrix.
         """
 
-        I_MAT = np.array([[1, 0],[0, 1]])
-        X_MAT = np.array([[0, 1],[1, 0]])
-        Y_MAT = np.array([[0, -1j],[1j, 0]])
-        Z_MAT = np.array([[1, 0],[0, -1]])
-
         # Activity 3.1 (optional).
-        paulis = [I_MAT, Z_MAT, X_MAT, Y_MAT]
-        matrix = np.ones((1,1),dtype = np.complex)
-
-        for pauli in reversed((self.z_bits + 2*self.x_bits).astype(int)):
-            matrix = np.kron(matrix, paulis[pauli])
+        size = 2**self._n_qubits
+        matrix = np.zeros((size, size), dtype=np.complex128)
+        cols, values = self.matrix_elements()
+        matrix[np.arange(size), cols] = values
 
         return matrix
 
@@ -367,11 +912,15 @@ class LinearCombinaisonPauliString(object):
         """
         Describes a linear combination of Pauli Strings.
 
+        The `z_bits` and `x_bits` of all the `PauliStrings` are also stored as
+        two read-only arrays of shape `(n_terms, n_qubits)` so that the
+        methods working on all the terms at once are vectorized.
+
         Parameters
         ----------
         coefs : np.array
             Coefficients multiplying the respective `PauliStrings`.
-        pauli_strings : np.array<PauliString>
+        pauli_strings : list<PauliString>
             PauliStrings.
 
         Raises
@@ -386,16 +935,77 @@ class LinearCombinaisonPauliString(object):
         if len(coefs) != len(pauli_strings):
             raise ValueError('Must provide a equal number of coefs and PauliString')
 
-        n_qubits = len(pauli_strings[0])
-        for pauli in pauli_strings:
-            if len(pauli) != n_qubits:
-                raise ValueError('All PauliString must be of same length')
+        if len({pauli.n_qubits for pauli in pauli_strings}) > 1:
+            raise ValueError('All PauliString must be of same length')
 
         self.n_terms = len(pauli_strings)
         self.n_qubits = len(pauli_strings[0])
 
-        self.coefs = np.array(coefs, dtype=complex)
-        self.pauli_strings = np.array(pauli_strings, dtype=PauliString)
+        # A tuple rather than an object array: `PauliStrings` are not
+        # vectorized, the arrays below are. Being immutable, it can be shared
+        # between LCPS like the bits.
+        self.coefs = np.array(coefs, dtype=np.complex128)
+        self._pauli_strings = tuple(pauli_strings)
+
+        # Structure of arrays: line `i` holds the bits of `pauli_strings[i]`.
+        # Unpacking all the packed ints at once is faster than stacking the
+        # `z_bits` and `x_bits` of each `PauliString`.
+        self.z_bits = _ints_to_bits([ps.z for ps in self._pauli_strings], self.n_qubits)
+        self.x_bits = _ints_to_bits([ps.x for ps in self._pauli_strings], self.n_qubits)
+        self.z_bits.flags.writeable = False
+        self.x_bits.flags.writeable = False
+
+    @classmethod
+    def _from_validated(cls, coefs, z_bits, x_bits, pauli_strings=None):
+        """
+        Build a LCPS from already consistent arrays, skipping the checks of
+        the constructor. The arrays are used as is, not copied, and the bits
+        are made read-only since they may be shared with other LCPS.
+
+        Parameters
+        ----------
+        coefs : np.array<complex>
+            Coefficients multiplying the respective `PauliStrings`.
+        z_bits : np.array<bool>
+            Array of shape `(n_terms, n_qubits)` of the `z_bits`.
+        x_bits : np.array<bool>
+            Array of shape `(n_terms, n_qubits)` of the `x_bits`.
+        pauli_strings : tuple<PauliString>, optional, default=None
+            The `PauliStrings` matching the bits. Built from the bits on first
+            access if `None`.
+
+        Returns
+        -------
+        LinearCombinaisonPauliString
+            LCPS sharing the given arrays.
+        """
+
+        new = cls.__new__(cls)
+        new.n_terms, new.n_qubits = z_bits.shape
+        new.coefs = np.ascontiguousarray(coefs, dtype=np.complex128)
+        new._pauli_strings = pauli_strings
+        new.z_bits = z_bits
+        new.x_bits = x_bits
+        new.z_bits.flags.writeable = False
+        new.x_bits.flags.writeable = False
+
+        return new
+
+    @property
+    def pauli_strings(self):
+        """
+        tuple<PauliString> : PauliStrings. Built from `z_bits` and `x_bits` on
+        first access when the LCPS was built from its bits.
+        """
+
+        if self._pauli_strings is None:
+            z_values = _words_to_ints(_bits_to_words(self.z_bits))
+            x_values = _words_to_ints(_bits_to_words(self.x_bits))
+            self._pauli_strings = tuple(
+                PauliString.from_ints(z, x, self.n_qubits)
+                for z, x in zip(z_values, x_values))
+
+        return self._pauli_strings
 
     def __str__(self):
         """
@@ -427,16 +1037,32 @@ class LinearCombinaisonPauliString(object):
             LCPS with the element specified in key.
         """
 
-        if isinstance(key,slice):
-            new_coefs = np.array(self.coefs[key])
-            new_pauli_strings = self.pauli_strings[key]
-        else:
-            if isinstance(key,int):
-                key = [key]
-            new_coefs = self.coefs[key]
-            new_pauli_strings = self.pauli_strings[key]
+        if isinstance(key,(int, np.integer)):
+            key = [key]
 
-        return self.__class__(new_coefs,new_pauli_strings)
+        return self._take(np.arange(self.n_terms)[key])
+
+    def _take(self, indices):
+        """
+        LCPS made of the terms at `indices`, without validating them again.
+
+        Parameters
+        ----------
+        indices : np.array<int>
+            Indices of the terms to keep, in order.
+
+        Returns
+        -------
+        LinearCombinaisonPauliString
+            LCPS with the terms at `indices`.
+        """
+
+        new_pauli_strings = None
+        if self._pauli_strings is not None:
+            new_pauli_strings = tuple(self._pauli_strings[i] for i in indices)
+
+        return self._from_validated(self.coefs[indices], self.z_bits[indices],
+                                    self.x_bits[indices], new_pauli_strings)
 
     def __len__(self):
         """
@@ -448,7 +1074,7 @@ class LinearCombinaisonPauliString(object):
             Number of `PauliStrings`/coefficients.
         """
 
-        return len(self.pauli_strings)
+        return self.n_terms
 
     def __add__(self,other):
         """
@@ -537,10 +1163,15 @@ class LinearCombinaisonPauliString(object):
             raise ValueError('Can only add with LCPS of identical number of qubits')
 
         # Activity 3.1.
+        # Both LCPS are already valid: only the arrays need to be merged.
         new_coefs = np.concatenate((self.coefs, other.coefs))
-        new_pauli_strings = np.concatenate((self.pauli_strings, other.pauli_strings))
+        new_z_bits = np.concatenate((self.z_bits, other.z_bits))
+        new_x_bits = np.concatenate((self.x_bits, other.x_bits))
+        new_pauli_strings = None
+        if self._pauli_strings is not None and other._pauli_strings is not None:
+            new_pauli_strings = self._pauli_strings + other._pauli_strings
 
-        return self.__class__(new_coefs, new_pauli_strings)
+        return self._from_validated(new_coefs, new_z_bits, new_x_bits, new_pauli_strings)
 
     def mul_linear_combinaison_pauli_string(self, other):
         """
@@ -564,22 +1195,142 @@ class LinearCombinaisonPauliString(object):
             New LCPS of length `len(self) * len(other)`.
         """
 
+        # Activity 3.1.
+        # The `PauliStrings` of the products are only built if needed.
+        new_z, new_x, new_coefs = self._packed_products(other)
+        new_z_bits = _words_to_bits(new_z, self.n_qubits)
+        new_x_bits = _words_to_bits(new_x, self.n_qubits)
+
+        return self._from_validated(new_coefs, new_z_bits, new_x_bits)
+
+    def mul_and_combine(self, other, threshold=None):
+        """
+        Multiply with an other LCPS, combine the coefficients of identical
+        `PauliStrings` and optionally remove the small ones. Gives the same
+        terms, in the same order, as
+        `(self * other).combine().apply_threshold(threshold)`.
+
+        The products are computed by blocks of rows of `self` and added to a
+        hash table of the distinct products as they go, so the memory used
+        scales with the number of distinct products plus one block rather
+        than with `len(self) * len(other)`. No product is skipped before
+        being combined: small products can add up above `threshold` or shift
+        a large coefficient, so `threshold` only applies to the combined
+        coefficients.
+
+        Parameters
+        ----------
+        other : LinearCombinaisonPauliString
+            An other LCPS.
+        threshold : float, optional, default=None
+            `PauliStrings` with combined coefficients smaller than
+            `threshold` will be removed. Nothing is removed if `None`.
+
+        Raises
+        ------
+        ValueError
+            If `other` is not an LCPS.
+        ValueError
+            If the other LCPS has not the same number of qubits.
+
+        Returns
+        -------
+        LinearCombinaisonPauliString
+            Product with combined coefficients.
+        """
+
         if not isinstance(other, LinearCombinaisonPauliString):
             raise ValueError()
 
         if self.n_qubits != other.n_qubits:
             raise ValueError('Can only add with LCPS of identical number of qubits')
 
-        new_coefs = np.zeros((len(self)*len(other),), dtype=np.complex)
-        new_pauli_strings = np.zeros((len(self)*len(other),), dtype=PauliString)
+        n_words = (self.n_qubits + 63)//64
+        block_size = max(1, _PRODUCTS_PER_BLOCK//max(1, len(other)))
+
+        # Pack both factors once, the blocks are slices of the packed rows.
+        z1 = _bits_to_words(self.z_bits)
+        x1 = _bits_to_words(self.x_bits)
+        z2 = _bits_to_words(other.z_bits)
+        x2 = _bits_to_words(other.x_bits)
+
+        groups = dict()
+        z_blocks = [np.zeros((0, n_words), dtype=_WORD)]
+        x_blocks = [np.zeros((0, n_words), dtype=_WORD)]
+        # Grown by doubling as new distinct products are found.
+        combined_coefs = np.zeros(_PRODUCTS_PER_BLOCK, dtype=np.complex128)
+        for start in range(0, self.n_terms, block_size):
+            stop = start + block_size
+            new_z, new_x, w = _mul_words(z1[start:stop], x1[start:stop], z2, x2)
+            new_z = new_z.reshape(-1, n_words)
+            new_x = new_x.reshape(-1, n_words)
+            new_coefs = (self.coefs[start:stop, None] * other.coefs[None, :] * _IPOW_NEG[w]).ravel()
+
+            index, inverse = _group_lines(np.concatenate((new_z, new_x), axis=1), groups)
+            z_blocks.append(new_z[index])
+            x_blocks.append(new_x[index])
+            if len(groups) > len(combined_coefs):
+                grown = np.zeros(max(2*len(combined_coefs), len(groups)), dtype=np.complex128)
+                grown[:len(combined_coefs)] = combined_coefs
+                combined_coefs = grown
+            np.add.at(combined_coefs, inverse, new_coefs)
+
+        combined_coefs = combined_coefs[:len(groups)]
+        combined_z = np.concatenate(z_blocks)
+        combined_x = np.concatenate(x_blocks)
+        if threshold is not None:
+            keep = np.abs(combined_coefs) >= threshold
+            combined_coefs = combined_coefs[keep]
+            combined_z, combined_x = combined_z[keep], combined_x[keep]
+
+        combined_z_bits = _words_to_bits(combined_z, self.n_qubits)
+        combined_x_bits = _words_to_bits(combined_x, self.n_qubits)
+
+        return self._from_validated(combined_coefs, combined_z_bits, combined_x_bits)
+
+    def _packed_products(self, other):
+        """
+        Products of all the pairs of terms of `self` and `other`, in the same
+        order as `mul_linear_combinaison_pauli_string`.
 
-        # Activity 3.1.
-        for i in range(self.n_terms):
-            for j in range(other.n_terms):
-                new_pauli_strings[i * other.n_terms + j], phase = self.pauli_strings[i] * other.pauli_strings[j]
-                new_coefs[i * other.n_terms + j] = self.coefs[i] * other.coefs[j] * phase
+        Parameters
+        ----------
+        other : LinearCombinaisonPauliString
+            An other LCPS.
 
-        return self.__class__(new_coefs, new_pauli_strings)
+        Raises
+        ------
+        ValueError
+            If `other` is not an LCPS.
+        ValueError
+            If the other LCPS has not the same number of qubits.
+
+        Returns
+        -------
+        np.ndarray<uint64>, np.ndarray<uint64>, np.ndarray<complex>
+            Packed `z` and `x` words of the products, of shape
+            `(len(self) * len(other), n_words)`, and their coefficients.
+        """
+
+        if not isinstance(other, LinearCombinaisonPauliString):
+            raise ValueError()
+
+        if self.n_qubits != other.n_qubits:
+            raise ValueError('Can only add with LCPS of identical number of qubits')
+
+        # All the products at once: self along the first axis, other along
+        # the second one and the 64 bits words along the last one.
+        n_words = (self.n_qubits + 63)//64
+        z1 = _bits_to_words(self.z_bits)
+        x1 = _bits_to_words(self.x_bits)
+        z2 = _bits_to_words(other.z_bits)
+        x2 = _bits_to_words(other.x_bits)
+        new_z, new_x, w = _mul_words(z1, x1, z2, x2)
+        phases = _IPOW_NEG[w]
+
+        new_coefs = (self.coefs[:, None] * other.coefs[None, :] * phases).ravel()
+
+        return new_z.reshape(-1, n_words), new_x.reshape(-1, n_words), new_coefs
 
     def mul_coef(self,other):
         """
@@ -608,9 +1359,9 @@ class LinearCombinaisonPauliString(object):
             if len(other) != self.__len__():
                 raise ValueError("Array length does not equal length of LCPS!")
         new_coefs = self.coefs * other
-        new_pauli_strings = self.pauli_strings
 
-        return self.__class__(new_coefs, new_pauli_strings)
+        # Only the coefficients change: share everything else.
+        return self._from_validated(new_coefs, self.z_bits, self.x_bits, self._pauli_strings)
 
     def to_zx_bits(self):
         """
@@ -624,9 +1375,7 @@ class LinearCombinaisonPauliString(object):
         """
 
         # Activity 3.1.
-        zx_bits = np.zeros((len(self), 2*self.n_qubits), dtype=np.bool)
-        for i, ps in enumerate(self.pauli_strings):
-            zx_bits[i, :] = ps.to_zx_bits()
+        zx_bits = np.concatenate((self.z_bits, self.x_bits), axis=1)
 
         return zx_bits
 
@@ -641,11 +1390,8 @@ class LinearCombinaisonPauliString(object):
             `xz_bits` of a `PauliString`.
         """
 
-        xz_bits = np.zeros((len(self), 2*self.n_qubits), dtype=np.bool)
-
         # Activity 3.1.
-        for i, ps in enumerate(self.pauli_strings):
-            xz_bits[i, :] = ps.to_xz_bits()
+        xz_bits = np.concatenate((self.x_bits, self.z_bits), axis=1)
 
         return xz_bits
 
@@ -661,11 +1407,8 @@ class LinearCombinaisonPauliString(object):
             `xz_bits` of a `PauliString`.
         """
 
-        ids = np.zeros((len(self), self.n_qubits), dtype=np.bool)
-
         # Activity 3.1.
-        for i, ps in enumerate(self.pauli_strings):
-            ids[i, :] = ps.ids()
+        ids = ~(self.z_bits | self.x_bits)
 
         return ids
 
@@ -682,16 +1425,13 @@ class LinearCombinaisonPauliString(object):
         """
 
         # Activity 3.1.
-        old_pauli_strings = self.to_zx_bits()
-        new_pauli_strings_zx = np.unique(old_pauli_strings, axis=0)
-        new_pauli_strings = np.array(
-            [PauliString.from_zx_bits(zx)
-             for zx in new_pauli_strings_zx], dtype=PauliString)
-        new_coefs = np.array(
-            [sum(self.coefs[(old_pauli_strings==u).all(axis=1)])
-             for u in new_pauli_strings_zx])
+        # Group the packed zx_bits, in order of first appearance. The
+        # `PauliStrings` of the result are only built if needed.
+        index, inverse = _group_lines(np.packbits(self.to_zx_bits(), axis=1))
+        new_coefs = np.zeros(len(index), dtype=np.complex128)
+        np.add.at(new_coefs, inverse, self.coefs)
 
-        return self.__class__(new_coefs, new_pauli_strings)
+        return self._from_validated(new_coefs, self.z_bits[index], self.x_bits[index])
 
     def apply_threshold(self, threshold=1e-6):
         """
@@ -727,15 +1467,33 @@ class LinearCombinaisonPauliString(object):
 
         cliques = list()
 
-        #################################################################
-        # YOUR CODE HERE
-        # TO COMPLETE (after activity 3.2)
-        # This one can be hard to implement
-        # Use to_zx_bits
-        # Transform all I into Z and look for unique PauliStrings
-        #################################################################
-
-        raise NotImplementedError()
+        # Activity 3.2.
+        # Two `PauliStrings` bitwise commute if, on every qubit, they are equal
+        # or one of them is I. The bits are packed into 64 bits words so that
+        # each test is a few bitwise operations per word.
+        z_words = _bits_to_words(self.z_bits)
+        x_words = _bits_to_words(self.x_bits)
+        non_ids = z_words | x_words
+        unassigned = np.ones(len(self), dtype=bool)
+        while unassigned.any():
+            # Greedily grow a clique from the first unassigned term. The
+            # support merges the Paulis of all the members, so a term
+            # commuting with it commutes with the whole clique.
+            clique = np.zeros(len(self), dtype=bool)
+            support_z = np.zeros(z_words.shape[1], dtype=z_words.dtype)
+            support_x = np.zeros(x_words.shape[1], dtype=x_words.dtype)
+            candidates = unassigned.copy()
+            while candidates.any():
+                i = np.argmax(candidates)
+                clique[i] = True
+                support_z |= z_words[i]
+                support_x |= x_words[i]
+                conflicts = (non_ids & (support_z | support_x)
+                             & ((z_words ^ support_z) | (x_words ^ support_x)))
+                candidates &= ~conflicts.any(axis=1)
+                candidates[i] = False
+            cliques.append(self[clique])
+            unassigned &= ~clique
 
         return cliques
 
@@ -750,15 +1508,12 @@ class LinearCombinaisonPauliString(object):
         """
 
         # Activity 3.1.
-        order = np.argsort(
-            [''.join((1*np.flip(bitstring)).astype(str))
-             for bitstring in self.to_zx_bits()])
-        #order = np.argsort([str(ps) for ps in self.pauli_strings])
-
-        new_coefs = self.coefs[order]
-        new_pauli_strings = self.pauli_strings[order]
+        # Order by the value of zx_bits read as a binary number, last bit
+        # being the most significant. np.lexsort uses its last key (the most
+        # significant word) as the primary key.
+        order = np.lexsort(_bits_to_words(self.to_zx_bits()).T)
 
-        return self.__class__(new_coefs, new_pauli_strings)
+        return self._take(order)
 
     def to_matrix(self):
         """
@@ -771,10 +1526,14 @@ class LinearCombinaisonPauliString(object):
         """
 
         size = 2**self.n_qubits
-        matrix = np.zeros((size, size), dtype=np.complex)
 
         # Activity 3.1.
-        for i in range(self.n_terms):
-            matrix += self.coefs[i]*self.pauli_strings[i].to_matrix()
+        # Accumulate the single non-zero element per line of all the terms
+        # directly in the matrix. A dense matrix implies at most 64 qubits,
+        # so one word per term.
+        z_masks = _bits_to_words(self.z_bits)[:, 0]
+        x_masks = _bits_to_words(self.x_bits)[:, 0]
+        factors = self.coefs * _IPOW_NEG[_popcount_words((z_masks & x_masks)[:, None]) & 3]
+        matrix = _scatter_matrix(z_masks, x_masks, factors, size)
 
         return matrix